@@ -0,0 +1,308 @@
+import asyncio
+import functools
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from sqlalchemy.engine.url import make_url
+
+from db_connections import (
+    build_mongodb_client_args,
+    build_mongodb_uri,
+    build_mysql_conn_args,
+    build_postgres_conn_args,
+    verify_target,
+)
+
+# Async drivers are optional; targets fall back to the thread executor
+# when the driver for their database type is not installed
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    AsyncMongoClient = None
+
+# Maximum number of checks in flight at once. Async checks only hold a socket
+# while waiting on the server, so this can be far higher than the thread count.
+DEFAULT_MAX_IN_FLIGHT = 10000
+
+# Maximum number of threads used for drivers without async support
+# (pyodbc, cx_Oracle, sqlite3)
+DEFAULT_MAX_THREADS = 32
+
+# Seconds allowed for a single check before it is reported as failed
+DEFAULT_TIMEOUT = 30
+
+# Function to build an SSL context for async drivers from the form's SSL options
+def build_ssl_context(ssl_options):
+    if not ssl_options or not ssl_options.get('use_ssl'):
+        return None
+
+    context = ssl.create_default_context(cafile=ssl_options.get('ca_cert'))
+
+    # Add client certificate if provided
+    if ssl_options.get('client_cert'):
+        context.load_cert_chain(ssl_options.get('client_cert'), ssl_options.get('client_key'))
+
+    # Set verify mode
+    if ssl_options.get('ssl_verify') == "Verify None":
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif ssl_options.get('ssl_verify') == "Verify CA":
+        context.check_hostname = False
+
+    return context
+
+# Function to test PostgreSQL connection with asyncpg
+async def _asyncpg_connect(target):
+    if 'uri' in target:
+        conn = await asyncpg.connect(dsn=target['uri'])
+    else:
+        conn_args = build_postgres_conn_args(
+            target.get('host'), target.get('port'), target.get('username'),
+            target.get('password'), target.get('database'), target.get('ssl_options')
+        )
+        conn_args['database'] = conn_args.pop('dbname', None)
+        ssl_context = build_ssl_context(target.get('ssl_options'))
+        for key in ('sslmode', 'sslrootcert', 'sslcert', 'sslkey'):
+            conn_args.pop(key, None)
+        conn = await asyncpg.connect(ssl=ssl_context, **conn_args)
+
+    try:
+        await conn.fetchval("SELECT 1")
+    finally:
+        await conn.close()
+
+# Function to test PostgreSQL connection with psycopg's async connection
+async def _psycopg_connect(target):
+    if 'uri' in target:
+        conn = await psycopg.AsyncConnection.connect(target['uri'])
+    else:
+        conn_args = build_postgres_conn_args(
+            target.get('host'), target.get('port'), target.get('username'),
+            target.get('password'), target.get('database'), target.get('ssl_options')
+        )
+        conn = await psycopg.AsyncConnection.connect(**conn_args)
+
+    try:
+        cursor = await conn.execute("SELECT 1")
+        await cursor.fetchone()
+    finally:
+        await conn.close()
+
+# Function to test PostgreSQL connection asynchronously
+async def async_test_postgres_connection(target):
+    try:
+        if asyncpg:
+            await _asyncpg_connect(target)
+        else:
+            await _psycopg_connect(target)
+
+        return True, "Successfully connected to PostgreSQL database!"
+    except Exception as e:
+        return False, f"Error connecting to PostgreSQL database: {str(e)}"
+
+# Function to test MySQL connection asynchronously
+async def async_test_mysql_connection(target):
+    try:
+        if 'uri' in target:
+            parsed_url = make_url(target['uri'])
+            conn_args = {
+                'host': parsed_url.host,
+                'port': parsed_url.port or 3306,
+                'user': parsed_url.username,
+                'password': parsed_url.password or '',
+            }
+            if parsed_url.database:
+                conn_args['db'] = parsed_url.database
+        else:
+            conn_args = build_mysql_conn_args(
+                target.get('host'), target.get('port'), target.get('username'),
+                target.get('password'), target.get('database'), target.get('ssl_options')
+            )
+            if 'database' in conn_args:
+                conn_args['db'] = conn_args.pop('database')
+
+            # aiomysql takes an SSL context rather than pymysql's dict of paths
+            conn_args.pop('ssl', None)
+            conn_args.pop('ssl_disabled', None)
+            ssl_context = build_ssl_context(target.get('ssl_options'))
+            if ssl_context:
+                conn_args['ssl'] = ssl_context
+
+        conn = await aiomysql.connect(**conn_args)
+
+        # Test the connection by executing a simple query
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+                await cursor.fetchone()
+        finally:
+            conn.close()
+
+        return True, "Successfully connected to MySQL database!"
+    except Exception as e:
+        return False, f"Error connecting to MySQL database: {str(e)}"
+
+# Function to test MongoDB connection asynchronously
+async def async_test_mongodb_connection(target):
+    try:
+        if 'uri' in target:
+            client = AsyncMongoClient(build_mongodb_uri(target['uri'], target.get('ssl_options')))
+        else:
+            connection_string, conn_options = build_mongodb_client_args(
+                target.get('host'), target.get('port'), target.get('username'),
+                target.get('password'), target.get('database'), target.get('auth_source', "admin"),
+                target.get('ssl_options'), target.get('replica_set')
+            )
+            client = AsyncMongoClient(connection_string, **conn_options)
+
+        # Test connection by getting server info
+        try:
+            await client.server_info()
+        finally:
+            await client.close()
+
+        return True, "Successfully connected to MongoDB server!"
+    except Exception as e:
+        return False, f"Error connecting to MongoDB server: {str(e)}"
+
+# Function to pick the async check for a target, or None to use the thread executor
+def get_async_check(target):
+    db_type = target.get('db_type')
+    uri = target.get('uri')
+
+    # Leave validation and scheme mismatches to the shared dispatch logic
+    if 'uri' in target:
+        if not uri:
+            return None
+        scheme = urlparse(uri).scheme
+    elif not target.get('host') or not target.get('port'):
+        return None
+    else:
+        scheme = None
+
+    # The async PostgreSQL and MySQL paths pass URIs through as they are, so a URI
+    # with SSL options goes to the sync path, which adds them the same way the form does
+    ssl_options = target.get('ssl_options')
+    uri_with_ssl = scheme is not None and bool(ssl_options and ssl_options.get('use_ssl'))
+
+    if db_type == "PostgreSQL" and (asyncpg or psycopg):
+        if scheme in [None, "postgresql", "postgres"] and not uri_with_ssl:
+            return async_test_postgres_connection
+    elif db_type == "MySQL" and aiomysql:
+        # URI query options are pymysql/SQLAlchemy specific, so keep those on the sync path
+        if scheme is None or (scheme in ["mysql", "mysql+pymysql"] and not urlparse(uri).query and not uri_with_ssl):
+            return async_test_mysql_connection
+    elif db_type == "MongoDB" and AsyncMongoClient:
+        if scheme in [None, "mongodb"]:
+            return async_test_mongodb_connection
+
+    return None
+
+# Threads available to sync checks. A slot is held until its thread finishes,
+# even after the check has timed out, so hung drivers cannot oversubscribe the
+# executor. Waiters give up once no thread has finished for a whole timeout:
+# every slot is then held by a hung check and the queue would never move.
+class ThreadSlots:
+    def __init__(self, count):
+        self.semaphore = asyncio.Semaphore(count)
+        self.last_release = time.monotonic()
+
+    # Wait for a slot, returning False if the executor stalled
+    async def acquire(self, timeout):
+        while True:
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                if time.monotonic() - self.last_release >= timeout:
+                    return False
+
+    def release(self):
+        self.last_release = time.monotonic()
+        self.semaphore.release()
+
+# Function to run the sync check for a target on the executor, calling on_start
+# once it has a thread. The timeout covers running, not queueing for a slot.
+async def _run_in_thread(target, executor, timeout, thread_slots=None, on_start=None):
+    loop = asyncio.get_running_loop()
+    if thread_slots is not None and not await thread_slots.acquire(timeout):
+        return False, f"Timed out after {timeout} seconds waiting for a free thread to check {target.get('db_type')} database"
+    if on_start:
+        on_start()
+    future = loop.run_in_executor(executor, functools.partial(verify_target, target, timeout))
+    if thread_slots is not None:
+        future.add_done_callback(lambda _: thread_slots.release())
+    # Shield so a timeout does not mark the future done while its thread is still busy
+    return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+# Function to verify a single target, using an async driver where possible.
+# on_start is called when the check itself starts, after any wait for a thread.
+async def async_verify_target(target, executor=None, timeout=DEFAULT_TIMEOUT, thread_slots=None, on_start=None):
+    check = get_async_check(target)
+    try:
+        if check:
+            if on_start:
+                on_start()
+            return await asyncio.wait_for(check(target), timeout)
+        return await _run_in_thread(target, executor, timeout, thread_slots, on_start)
+    except asyncio.TimeoutError:
+        return False, f"Timed out after {timeout} seconds connecting to {target.get('db_type')} database"
+
+# Function to verify many targets concurrently. Returns the results in target
+# order, plus the wall-clock start time and duration in milliseconds of each
+# check, measured from when it got a socket or thread; both are NaN for a check
+# that never started.
+async def async_verify_targets_timed(targets, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                                     max_threads=DEFAULT_MAX_THREADS, timeout=DEFAULT_TIMEOUT):
+    semaphore = asyncio.Semaphore(max_in_flight)
+    thread_slots = ThreadSlots(max_threads)
+    executor = ThreadPoolExecutor(max_workers=max_threads)
+    started_at = [float('nan')] * len(targets)
+    durations = [float('nan')] * len(targets)
+
+    async def run(index, target):
+        started = None
+
+        def on_start():
+            nonlocal started
+            started_at[index] = time.time()
+            started = time.perf_counter()
+
+        async with semaphore:
+            result = await async_verify_target(target, executor, timeout, thread_slots, on_start)
+        if started is not None:
+            durations[index] = (time.perf_counter() - started) * 1000
+        return result
+
+    try:
+        results = await asyncio.gather(*(run(index, target) for index, target in enumerate(targets)))
+    finally:
+        # Don't wait for checks that timed out; the driver timeouts end them on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, started_at, durations
+
+# Function to verify many targets concurrently, returning results in target order
+async def async_verify_targets(targets, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                               max_threads=DEFAULT_MAX_THREADS, timeout=DEFAULT_TIMEOUT):
+    results, _, _ = await async_verify_targets_timed(targets, max_in_flight, max_threads, timeout)
+    return results
+
+# Function to run async_verify_targets from synchronous code
+def verify_targets(targets, **kwargs):
+    return asyncio.run(async_verify_targets(targets, **kwargs))
@@ -0,0 +1,472 @@
+import sqlalchemy
+import pymongo
+import pymysql
+import psycopg2
+import sqlite3
+import os
+import math
+from urllib.parse import urlparse
+from sqlalchemy.engine.url import make_url
+
+# Function to build driver connect arguments that bound how long a check can block.
+# Oracle has no cx_Oracle connect argument for this; see set_oracle_call_timeout.
+def build_timeout_args(db_type, timeout=None):
+    if not timeout:
+        return {}
+    seconds = max(1, int(math.ceil(timeout)))
+    
+    if db_type == "MySQL":
+        return {'connect_timeout': timeout, 'read_timeout': timeout, 'write_timeout': timeout}
+    elif db_type == "PostgreSQL":
+        return {
+            'connect_timeout': seconds,
+            # Detect a peer that stops answering on an open connection
+            'keepalives': 1,
+            'keepalives_idle': seconds,
+            'keepalives_interval': 1,
+            'keepalives_count': 3,
+            'tcp_user_timeout': int(timeout * 1000),
+        }
+    elif db_type == "MongoDB":
+        timeout_ms = int(timeout * 1000)
+        return {'serverSelectionTimeoutMS': timeout_ms, 'connectTimeoutMS': timeout_ms, 'socketTimeoutMS': timeout_ms}
+    elif db_type == "Microsoft SQL Server":
+        # pyodbc login timeout
+        return {'timeout': seconds}
+    elif db_type == "SQLite":
+        return {'timeout': timeout}
+    return {}
+
+# Function to bound every Oracle round trip on connections from an engine
+def set_oracle_call_timeout(engine, timeout=None):
+    if not timeout:
+        return
+    
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.call_timeout = int(timeout * 1000)
+    
+    sqlalchemy.event.listen(engine, "connect", on_connect)
+
+# Function to build pymysql connection arguments from connection details
+def build_mysql_conn_args(host, port, user, password, database=None, ssl_options=None):
+    conn_args = {
+        'host': host,
+        'port': int(port),
+        'user': user,
+        'password': password
+    }
+    
+    if database:
+        conn_args['database'] = database
+    
+    conn_args.update(build_mysql_ssl_args(ssl_options))
+    return conn_args
+
+# Function to build pymysql SSL arguments from the form's SSL options
+def build_mysql_ssl_args(ssl_options=None):
+    ssl_args = {}
+    
+    # Add SSL options if provided
+    if ssl_options and ssl_options.get('use_ssl'):
+        ssl_context = {}
+        
+        # Add certificate paths if provided
+        if ssl_options.get('ca_cert'):
+            ssl_context['ca'] = ssl_options.get('ca_cert')
+        if ssl_options.get('client_cert'):
+            ssl_context['cert'] = ssl_options.get('client_cert')
+        if ssl_options.get('client_key'):
+            ssl_context['key'] = ssl_options.get('client_key')
+        
+        # Set verify mode
+        if ssl_options.get('ssl_verify') == "Verify None":
+            ssl_context['check_hostname'] = False
+        
+        if ssl_context:
+            ssl_args['ssl'] = ssl_context
+        else:
+            ssl_args['ssl_disabled'] = False
+    
+    return ssl_args
+
+# Function to build pymysql connection arguments from a MySQL URI, with the
+# form's SSL options applied on top of any SSL settings in the URI query
+def build_mysql_uri_args(uri, ssl_options=None):
+    # SQLAlchemy's pymysql dialect translates URI query options such as ssl_ca
+    url = make_url(uri).set(drivername="mysql+pymysql")
+    _, conn_args = sqlalchemy.create_engine(url).dialect.create_connect_args(url)
+    conn_args.pop('client_flag', None)
+    
+    ssl_args = build_mysql_ssl_args(ssl_options)
+    if 'ssl' in ssl_args:
+        ssl_args['ssl'] = {**(conn_args.get('ssl') or {}), **ssl_args['ssl']}
+    conn_args.update(ssl_args)
+    return conn_args
+
+# Function to build psycopg2 connection arguments from connection details
+def build_postgres_conn_args(host, port, user, password, database=None, ssl_options=None):
+    conn_args = {
+        'host': host,
+        'port': int(port),
+        'user': user,
+        'password': password
+    }
+    
+    if database:
+        conn_args['dbname'] = database
+    
+    conn_args.update(build_postgres_ssl_args(ssl_options))
+    return conn_args
+
+# Function to build psycopg2 SSL arguments from the form's SSL options
+def build_postgres_ssl_args(ssl_options=None):
+    ssl_args = {}
+    
+    # Add SSL options if provided
+    if ssl_options and ssl_options.get('use_ssl'):
+        if ssl_options.get('ssl_verify') == "Verify CA":
+            ssl_args['sslmode'] = 'verify-ca'
+        elif ssl_options.get('ssl_verify') == "Verify Full":
+            ssl_args['sslmode'] = 'verify-full'
+        elif ssl_options.get('ssl_verify') == "Verify None":
+            ssl_args['sslmode'] = 'require'
+        
+        # Add certificate paths if provided
+        if ssl_options.get('ca_cert'):
+            ssl_args['sslrootcert'] = ssl_options.get('ca_cert')
+        if ssl_options.get('client_cert'):
+            ssl_args['sslcert'] = ssl_options.get('client_cert')
+        if ssl_options.get('client_key'):
+            ssl_args['sslkey'] = ssl_options.get('client_key')
+    
+    return ssl_args
+
+# Function to build psycopg2 connection arguments from a PostgreSQL URI, with the
+# form's SSL options applied on top of any libpq options in the URI query
+def build_postgres_uri_args(uri, ssl_options=None):
+    url = make_url(uri)
+    conn_args = url.translate_connect_args(username='user', database='dbname')
+    conn_args.update(url.query)
+    conn_args.update(build_postgres_ssl_args(ssl_options))
+    return conn_args
+
+# Function to add SSL options to a MongoDB URI
+def build_mongodb_uri(uri, ssl_options=None):
+    if ssl_options and ssl_options.get('use_ssl'):
+        # Parse the URI to check if it already contains query parameters
+        if '?' in uri:
+            uri += '&ssl=true'
+        else:
+            uri += '?ssl=true'
+        
+        # Add SSL verification option
+        if ssl_options.get('ssl_verify') == "Verify None":
+            uri += '&tlsAllowInvalidCertificates=true'
+        
+        # Add certificate paths if provided
+        if ssl_options.get('ca_cert'):
+            uri += f'&tlsCAFile={ssl_options.get("ca_cert")}'
+        if ssl_options.get('client_cert'):
+            uri += f'&tlsCertificateKeyFile={ssl_options.get("client_cert")}'
+    
+    return uri
+
+# Function to build a MongoDB connection string and client options from connection details
+def build_mongodb_client_args(host, port, user, password, database=None, auth_source="admin", ssl_options=None, replica_set=None):
+    # Create connection options
+    conn_options = {}
+    
+    # Add SSL options if provided
+    if ssl_options and ssl_options.get('use_ssl'):
+        conn_options['ssl'] = True
+        
+        if ssl_options.get('ssl_verify') == "Verify None":
+            conn_options['tlsAllowInvalidCertificates'] = True
+        
+        # Add certificate paths if provided
+        if ssl_options.get('ca_cert'):
+            conn_options['tlsCAFile'] = ssl_options.get('ca_cert')
+        if ssl_options.get('client_cert'):
+            conn_options['tlsCertificateKeyFile'] = ssl_options.get('client_cert')
+    
+    # Add replica set if provided
+    if replica_set:
+        conn_options['replicaSet'] = replica_set
+        
+    # Create MongoDB connection string
+    if user and password:
+        connection_string = f"mongodb://{user}:{password}@{host}:{port}/{database or ''}?authSource={auth_source}"
+    else:
+        connection_string = f"mongodb://{host}:{port}/{database or ''}"
+    
+    return connection_string, conn_options
+
+# Function to build a SQLAlchemy URL for Microsoft SQL Server
+def build_mssql_url(host, port, user, password, database=None, uri=None, ssl_options=None):
+    if uri:
+        # Add SSL options to URI if provided
+        if ssl_options and ssl_options.get('use_ssl'):
+            # Ensure we're using encrypt=true for SSL
+            if '?' in uri:
+                uri += '&encrypt=true'
+            else:
+                uri += '?encrypt=true'
+            
+            # Add trust server certificate option for Verify None
+            if ssl_options.get('ssl_verify') == "Verify None":
+                uri += '&trustServerCertificate=true'
+        
+        return uri
+    
+    # Construct the connection string
+    conn_str = f"mssql+pyodbc://{user}:{password}@{host}:{port}"
+    if database:
+        conn_str += f"/{database}"
+    
+    # Add driver information
+    conn_str += "?driver=ODBC+Driver+17+for+SQL+Server"
+    
+    # Add SSL options if provided
+    if ssl_options and ssl_options.get('use_ssl'):
+        conn_str += "&encrypt=true"
+        
+        # Add trust server certificate option for Verify None
+        if ssl_options.get('ssl_verify') == "Verify None":
+            conn_str += "&trustServerCertificate=true"
+    
+    return conn_str
+
+# Function to build a SQLAlchemy URL for Oracle, or None if neither service name nor SID is given
+def build_oracle_url(host, port, user, password, service_name=None, sid=None, uri=None, ssl_options=None):
+    if uri:
+        return uri
+    
+    # Determine if we're using service name or SID
+    if service_name:
+        # Format for service name
+        dsn = f"{host}:{port}/{service_name}"
+    elif sid:
+        # Format for SID
+        dsn = f"{host}:{port}:{sid}"
+    else:
+        return None
+    
+    # Construct the connection string
+    conn_str = f"oracle+cx_oracle://{user}:{password}@{dsn}"
+    
+    # Add SSL options if provided
+    if ssl_options and ssl_options.get('use_ssl'):
+        conn_str += "?ssl=true"
+        
+        # Add certificate paths if provided
+        if ssl_options.get('wallet_location'):
+            conn_str += f"&wallet_location={ssl_options.get('wallet_location')}"
+    
+    return conn_str
+
+# Function to test MySQL connection
+def test_mysql_connection(host, port, user, password, database=None, uri=None, ssl_options=None, timeout=None):
+    try:
+        if uri:
+            conn_args = build_mysql_uri_args(uri, ssl_options)
+        else:
+            conn_args = build_mysql_conn_args(host, port, user, password, database, ssl_options)
+        conn = pymysql.connect(**{**conn_args, **build_timeout_args("MySQL", timeout)})
+            
+        # Test the connection by executing a simple query
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        result = cursor.fetchone()
+        
+        # Close connection
+        cursor.close()
+        conn.close()
+        
+        return True, "Successfully connected to MySQL database!"
+    except Exception as e:
+        return False, f"Error connecting to MySQL database: {str(e)}"
+
+# Function to test PostgreSQL connection
+def test_postgres_connection(host, port, user, password, database=None, uri=None, ssl_options=None, timeout=None):
+    try:
+        if uri:
+            conn_args = build_postgres_uri_args(uri, ssl_options)
+        else:
+            conn_args = build_postgres_conn_args(host, port, user, password, database, ssl_options)
+        conn = psycopg2.connect(**{**conn_args, **build_timeout_args("PostgreSQL", timeout)})
+            
+        # Test the connection
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        result = cursor.fetchone()
+        
+        # Close connection
+        cursor.close()
+        conn.close()
+        
+        return True, "Successfully connected to PostgreSQL database!"
+    except Exception as e:
+        return False, f"Error connecting to PostgreSQL database: {str(e)}"
+
+# Function to test MongoDB connection
+def test_mongodb_connection(host, port, user, password, database=None, auth_source="admin", uri=None, ssl_options=None, replica_set=None, timeout=None):
+    try:
+        if uri:
+            client = pymongo.MongoClient(build_mongodb_uri(uri, ssl_options), **build_timeout_args("MongoDB", timeout))
+        else:
+            connection_string, conn_options = build_mongodb_client_args(
+                host, port, user, password, database, auth_source, ssl_options, replica_set
+            )
+            client = pymongo.MongoClient(connection_string, **conn_options, **build_timeout_args("MongoDB", timeout))
+        
+        # Test connection by getting server info
+        server_info = client.server_info()
+        
+        # Close connection
+        client.close()
+        
+        return True, "Successfully connected to MongoDB server!"
+    except Exception as e:
+        return False, f"Error connecting to MongoDB server: {str(e)}"
+
+# Function to test SQLite connection
+def test_sqlite_connection(database_path, create_if_not_exists=False, timeout=None):
+    try:
+        if not os.path.exists(database_path) and not create_if_not_exists:
+            return False, f"SQLite database file not found: {database_path}"
+        
+        # Connect to SQLite database
+        conn = sqlite3.connect(database_path, **build_timeout_args("SQLite", timeout))
+        
+        # Test the connection
+        cursor = conn.cursor()
+        cursor.execute("SELECT sqlite_version();")
+        version = cursor.fetchone()
+        
+        # Close connection
+        cursor.close()
+        conn.close()
+        
+        return True, f"Successfully connected to SQLite database (version: {version[0]})!"
+    except Exception as e:
+        return False, f"Error connecting to SQLite database: {str(e)}"
+
+# Function to test Microsoft SQL Server connection
+def test_mssql_connection(host, port, user, password, database=None, uri=None, ssl_options=None, timeout=None):
+    try:
+        engine = sqlalchemy.create_engine(
+            build_mssql_url(host, port, user, password, database, uri, ssl_options),
+            connect_args=build_timeout_args("Microsoft SQL Server", timeout)
+        )
+        conn = engine.connect()
+        
+        # Test the connection with a simple query
+        result = conn.execute(sqlalchemy.text("SELECT @@VERSION"))
+        version = result.scalar()
+        
+        # Close connection
+        conn.close()
+        
+        return True, f"Successfully connected to Microsoft SQL Server!"
+    except Exception as e:
+        return False, f"Error connecting to Microsoft SQL Server: {str(e)}"
+
+# Function to test Oracle connection
+def test_oracle_connection(host, port, user, password, service_name=None, sid=None, uri=None, ssl_options=None, timeout=None):
+    try:
+        conn_str = build_oracle_url(host, port, user, password, service_name, sid, uri, ssl_options)
+        if not conn_str:
+            return False, "Either Service Name or SID must be provided for Oracle connection"
+        
+        engine = sqlalchemy.create_engine(conn_str)
+        set_oracle_call_timeout(engine, timeout)
+        conn = engine.connect()
+        
+        # Test the connection with a simple query
+        result = conn.execute(sqlalchemy.text("SELECT BANNER FROM V$VERSION WHERE ROWNUM = 1"))
+        version = result.scalar()
+        
+        # Close connection
+        conn.close()
+        
+        return True, "Successfully connected to Oracle database!"
+    except Exception as e:
+        return False, f"Error connecting to Oracle database: {str(e)}"
+
+
+# Function to dispatch a connection test for a single target.
+# A target is a dict with 'db_type' and either 'uri' or the connection details
+# ('host', 'port', 'username', 'password', 'database', 'ssl_options' and the
+# database-specific options used by the form in db-verify-main.py).
+def verify_target(target, timeout=None):
+    db_type = target.get('db_type')
+    ssl_options = target.get('ssl_options')
+    
+    if 'uri' in target:
+        uri = target.get('uri')
+        if not uri:
+            return False, "Please enter a connection URI"
+        
+        # Parse URI to get database type
+        parsed_uri = urlparse(uri)
+        scheme = parsed_uri.scheme
+        
+        if db_type == "MySQL" and scheme in ["mysql", "mysql+pymysql"]:
+            return test_mysql_connection(None, None, None, None, uri=uri, ssl_options=ssl_options, timeout=timeout)
+        elif db_type == "PostgreSQL" and scheme in ["postgresql", "postgres"]:
+            return test_postgres_connection(None, None, None, None, uri=uri, ssl_options=ssl_options, timeout=timeout)
+        elif db_type == "MongoDB" and scheme == "mongodb":
+            return test_mongodb_connection(None, None, None, None, uri=uri, ssl_options=ssl_options, timeout=timeout)
+        elif db_type == "Microsoft SQL Server" and scheme in ["mssql", "mssql+pyodbc"]:
+            return test_mssql_connection(None, None, None, None, uri=uri, ssl_options=ssl_options, timeout=timeout)
+        elif db_type == "Oracle" and scheme in ["oracle", "oracle+cx_oracle"]:
+            return test_oracle_connection(None, None, None, None, uri=uri, ssl_options=ssl_options, timeout=timeout)
+        elif db_type == "SQLite" and (scheme == "sqlite" or parsed_uri.path):
+            db_path = parsed_uri.path
+            if db_path.startswith('/'):
+                db_path = db_path[1:]  # Remove leading slash
+            return test_sqlite_connection(db_path, timeout=timeout)
+        else:
+            return False, f"URI scheme '{scheme}' does not match selected database type '{db_type}'"
+    
+    # Special case for SQLite which doesn't require host/port
+    if db_type == "SQLite":
+        sqlite_file = target.get('sqlite_file')
+        if not sqlite_file:
+            return False, "Please enter a SQLite database file path"
+        return test_sqlite_connection(sqlite_file, target.get('create_if_not_exists', False), timeout)
+    
+    host = target.get('host')
+    port = target.get('port')
+    username = target.get('username')
+    password = target.get('password')
+    database = target.get('database')
+    
+    # All other database types require host and port
+    if not host or not port:
+        return False, "Host and port are required"
+    
+    if db_type == "MySQL":
+        return test_mysql_connection(
+            host, port, username, password, database, ssl_options=ssl_options, timeout=timeout
+        )
+    elif db_type == "PostgreSQL":
+        return test_postgres_connection(
+            host, port, username, password, database, ssl_options=ssl_options, timeout=timeout
+        )
+    elif db_type == "MongoDB":
+        return test_mongodb_connection(
+            host, port, username, password, database, target.get('auth_source', "admin"),
+            ssl_options=ssl_options, replica_set=target.get('replica_set'), timeout=timeout
+        )
+    elif db_type == "Microsoft SQL Server":
+        return test_mssql_connection(
+            host, port, username, password, database, ssl_options=ssl_options, timeout=timeout
+        )
+    elif db_type == "Oracle":
+        return test_oracle_connection(
+            host, port, username, password, target.get('service_name'), target.get('sid'),
+            ssl_options=ssl_options, timeout=timeout
+        )
+    else:
+        return False, f"Unsupported database type: {db_type}"
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from async_verify import DEFAULT_MAX_THREADS, DEFAULT_TIMEOUT, async_verify_targets_timed
+from incremental_verify import target_key
+from keepalive_probe import KeepaliveProbe, probe_all, probe_deadline
+from result_buffer import BACKENDS, OUTCOME_SUCCESS, OUTCOMES, ResultBuffer, classify_outcome
+
+# Seconds between probe cycles
+DEFAULT_PROBE_INTERVAL = 30
+
+# Status codes for the fleet grid; targets that have not been probed yet are pending
+STATUS_PENDING = -1
+
+# Background prober that checks a fleet of targets every cycle and keeps the
+# results in a ResultBuffer plus a per-target latest-status array. With
+# keepalive=True it holds one connection per target and only sends a liveness
+# command each cycle instead of opening a new connection; set_keepalive switches
+# modes on a running monitor.
+class FleetMonitor:
+    def __init__(self, targets, interval=DEFAULT_PROBE_INTERVAL, capacity=None, timeout=DEFAULT_TIMEOUT, keepalive=False):
+        self.targets = list(targets)
+        self.interval = interval
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.keepalive_probes = None
+        self.buffer = ResultBuffer(capacity) if capacity else ResultBuffer()
+        self.keys = [target_key(target) for target in self.targets]
+        self.ids = np.array([self.buffer.target_id(key) for key in self.keys], dtype=np.uint32)
+        self.backends = np.array([BACKENDS.index(target.get('db_type')) for target in self.targets], dtype=np.uint8)
+
+        # Latest outcome per target and the cycle in which it last changed,
+        # so the dashboard can redraw only targets that changed since it last looked
+        self.status = np.full(len(self.targets), STATUS_PENDING, dtype=np.int16)
+        self.messages = [""] * len(self.targets)
+        self.changed_in = np.zeros(len(self.targets), dtype=np.int64)
+        self.reconnects = np.zeros(len(self.targets), dtype=np.int64)
+        self.cycle = 0
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def is_running(self):
+        return bool(self.thread and self.thread.is_alive())
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.probe_once()
+            self.stop_event.wait(max(0, self.interval - (time.monotonic() - started)))
+        self._close_probes()
+
+    # Switch keepalive mode; the probe thread applies it at the start of its next cycle
+    def set_keepalive(self, enabled):
+        self.keepalive = enabled
+
+    def _apply_mode(self):
+        if self.keepalive and self.keepalive_probes is None:
+            self.keepalive_probes = [KeepaliveProbe(target, self.timeout) for target in self.targets]
+        elif not self.keepalive and self.keepalive_probes is not None:
+            self._close_probes()
+
+    def _close_probes(self):
+        for probe in self.keepalive_probes or []:
+            probe.close()
+        self.keepalive_probes = None
+
+    # Check every target once and record the results
+    def probe_once(self):
+        self._apply_mode()
+        if self.keepalive_probes is not None:
+            timestamps, latencies, results, reconnected = self._keepalive_all()
+        else:
+            timestamps, total, results = self._probe_all()
+            latencies = {'total': total}
+            reconnected = None
+        outcomes = np.array([classify_outcome(success, message) for success, message in results], dtype=np.uint8)
+
+        with self.lock:
+            self.cycle += 1
+            changed = self.status != outcomes
+            self.changed_in[changed] = self.cycle
+            self.status[:] = outcomes
+            self.messages = [message for _, message in results]
+            if reconnected is not None:
+                self.reconnects += reconnected
+            self.buffer.append_many(self.ids, self.backends, outcomes, latencies, timestamps)
+
+    # Send one liveness command per held connection. The liveness round trip is
+    # recorded as the query latency and any reconnect as the connect latency. Total
+    # is left unmeasured, as it holds connect-plus-query time from normal probing.
+    def _keepalive_all(self):
+        executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_THREADS)
+        timestamps = np.full(len(self.targets), time.time())
+        try:
+            probe_results = probe_all(self.keepalive_probes, executor, probe_deadline(self.timeout))
+        finally:
+            # Probes past their deadline were already reported as timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        rtt = np.array([np.nan if r['rtt_ms'] is None else r['rtt_ms'] for r in probe_results], dtype=np.float32)
+        connect = np.array([np.nan if r['connect_ms'] is None else r['connect_ms'] for r in probe_results], dtype=np.float32)
+        reconnected = np.array([r['reconnected'] for r in probe_results], dtype=np.int64)
+        results = [(r['success'], r['message']) for r in probe_results]
+        return timestamps, {'query': rtt, 'connect': connect}, results, reconnected
+
+    # Check every target with a fresh connection. Latency is timed from when each
+    # check got a socket or thread, so queueing behind other checks is not counted.
+    def _probe_all(self):
+        results, started_at, durations = asyncio.run(async_verify_targets_timed(self.targets, timeout=self.timeout))
+        timestamps = np.array(started_at, dtype=np.float64)
+        # Checks that never started are stamped with the time they gave up
+        timestamps[np.isnan(timestamps)] = time.time()
+        return timestamps, np.array(durations, dtype=np.float32), results
+
+    # Snapshot of the latest status per target
+    def snapshot(self):
+        with self.lock:
+            return self.cycle, self.status.copy(), self.changed_in.copy(), list(self.messages)
+
+    # Rows for targets whose status changed after the given cycle
+    def changes_since(self, cycle):
+        with self.lock:
+            indices = np.flatnonzero(self.changed_in > cycle)
+            return pd.DataFrame({
+                'target': [self.keys[index] for index in indices],
+                'backend': [BACKENDS[self.backends[index]] for index in indices],
+                'status': [OUTCOMES[self.status[index]] for index in indices],
+                'message': [self.messages[index] for index in indices],
+            })
+
+    def error_rates(self, since=None):
+        with self.lock:
+            return self.buffer.error_rates('backend', since)
+
+    # Latency stage measured in the current mode: the liveness round trip with
+    # keepalive, or connect-plus-query time with a fresh connection per probe
+    def latency_stage(self):
+        return 'query' if self.keepalive else 'total'
+
+    def latency_percentiles(self, since=None, stage='total'):
+        with self.lock:
+            return self.buffer.percentiles(stage, 'backend', since=since)
+
+    # Downsample a stage's latency into per-backend time buckets starting at since
+    def latency_buckets(self, bucket_seconds, since=0, stage='total'):
+        with self.lock:
+            columns = self.buffer.columns()
+            mask = columns['timestamp'] >= since
+            frame = pd.DataFrame({
+                'bucket': (columns['timestamp'][mask] // bucket_seconds) * bucket_seconds,
+                'backend': columns['backend'][mask],
+                'latency': columns[f"{stage}_ms"][mask],
+            })
+        frame = frame.dropna(subset=['latency'])
+        grouped = frame.groupby(['backend', 'bucket'])['latency']
+        return grouped.agg(['median', 'max']).reset_index()
+
+# Function to refresh cached latency buckets, recomputing only the newest bucket and any after it.
+# Returns the combined buckets and the start of the newest bucket, which may still be filling.
+def update_latency_buckets(monitor, cached, last_bucket, bucket_seconds, stage='total'):
+    fresh = monitor.latency_buckets(bucket_seconds, since=last_bucket or 0, stage=stage)
+    if cached is not None and last_bucket is not None:
+        cached = cached[cached['bucket'] < last_bucket]
+        fresh = pd.concat([cached, fresh], ignore_index=True)
+    newest = fresh['bucket'].max() if len(fresh) else last_bucket
+    return fresh, newest
+
+# Function to arrange per-target statuses into a square-ish grid for a heatmap
+def status_grid(status, columns=None):
+    count = len(status)
+    columns = columns or max(1, int(np.ceil(np.sqrt(count))))
+    rows = max(1, int(np.ceil(count / columns)))
+    grid = np.full(rows * columns, np.nan)
+    # Map to 0 = pending, 1 = passing, 2 = failing for a three-colour scale
+    grid[:count] = np.where(status == STATUS_PENDING, 0, np.where(status == OUTCOME_SUCCESS, 1, 2))
+    return grid.reshape(rows, columns)
@@ -0,0 +1,231 @@
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from async_verify import verify_targets
+
+# Default file holding the fingerprints and results of the last run
+DEFAULT_STATE_PATH = ".dburl-verify-state.json"
+
+# Seconds after which a passing result is re-checked even if nothing changed
+DEFAULT_MAX_AGE = 3600
+
+# Threads used to resolve host names while fingerprinting
+RESOLVE_THREADS = 32
+
+# Default ports, used so that an explicit default port and an omitted one fingerprint the same
+DEFAULT_PORTS = {
+    "MySQL": 3306,
+    "PostgreSQL": 5432,
+    "MongoDB": 27017,
+    "Microsoft SQL Server": 1433,
+    "Oracle": 1521
+}
+
+# Target fields that select which database is checked, apart from host/port
+DETAIL_FIELDS = [
+    'username', 'password', 'database', 'auth_source', 'replica_set',
+    'service_name', 'sid', 'sqlite_file', 'create_if_not_exists'
+]
+
+# Function to split a connection URI into normalized parts, so equivalent
+# spellings (case, explicit default port, query order) compare equal
+def uri_parts(uri, db_type=None):
+    parsed = urlparse(uri)
+    try:
+        port = parsed.port or DEFAULT_PORTS.get(db_type)
+    except ValueError:
+        # Keep a malformed port as text so the target still gets a stable key
+        host_port = parsed.netloc.rpartition('@')[2]
+        port = host_port.rpartition(':')[2]
+    return {
+        'scheme': parsed.scheme.lower(),
+        'username': parsed.username,
+        'password': parsed.password,
+        'host': parsed.hostname or '',
+        'port': str(port) if parsed.hostname and port else '',
+        'path': parsed.path,
+        'query': urlencode(sorted(parse_qsl(parsed.query))),
+    }
+
+# Function to normalize a connection URI so equivalent spellings compare equal
+def normalize_uri(uri, db_type=None):
+    parts = uri_parts(uri, db_type)
+    netloc = parts['host']
+    if parts['username']:
+        credentials = parts['username']
+        if parts['password']:
+            credentials += f":{parts['password']}"
+        netloc = f"{credentials}@{netloc}"
+    if parts['port']:
+        netloc += f":{parts['port']}"
+    return f"{parts['scheme']}://{netloc}{parts['path']}" + (f"?{parts['query']}" if parts['query'] else "")
+
+# Function to get the host and port a target connects to, if any
+def get_host_port(target):
+    if 'uri' in target:
+        parsed = urlparse(target.get('uri') or '')
+        try:
+            port = parsed.port
+        except ValueError:
+            port = None
+        return parsed.hostname, port or DEFAULT_PORTS.get(target.get('db_type'))
+    if target.get('db_type') == "SQLite":
+        return None, None
+    return target.get('host'), target.get('port') or DEFAULT_PORTS.get(target.get('db_type'))
+
+# Function to resolve a host to its sorted set of addresses
+def resolve_addresses(host, port):
+    if not host:
+        return []
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError) as e:
+        return [f"unresolved: {e}"]
+    return sorted({info[4][0] for info in infos})
+
+# Function to get the modification time of a file, or None if it is missing
+def get_mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+# Function to build a stable key identifying a target across runs. It covers the
+# same connection settings as the fingerprint except the password, so targets
+# that differ only in options (URI query, SSL settings, replica set) keep
+# separate state instead of overwriting each other's fingerprint every run.
+def target_key(target):
+    if target.get('id'):
+        return str(target['id'])
+    db_type = target.get('db_type')
+    if 'uri' in target:
+        parts = uri_parts(target.get('uri') or '', db_type)
+        identity = [parts[field] for field in ('scheme', 'host', 'port', 'path', 'username', 'query')]
+    else:
+        host, port = get_host_port(target)
+        identity = [(host or '').lower(), str(port or '')]
+        identity += [target.get(field) for field in DETAIL_FIELDS if field != 'password']
+    identity.append(target.get('ssl_options') or {})
+    return f"{db_type}:" + json.dumps(identity, sort_keys=True)
+
+# Function to fingerprint everything about a target that can change a check's outcome
+def fingerprint_target(target):
+    db_type = target.get('db_type')
+    ssl_options = target.get('ssl_options') or {}
+    host, port = get_host_port(target)
+
+    if 'uri' in target:
+        connection = {'uri': normalize_uri(target.get('uri') or '', db_type)}
+    else:
+        connection = {field: target.get(field) for field in DETAIL_FIELDS}
+        connection['host'] = (host or '').lower()
+        connection['port'] = str(port or '')
+
+    files = {}
+    for key in ('ca_cert', 'client_cert', 'client_key', 'wallet_location'):
+        if ssl_options.get(key):
+            files[ssl_options[key]] = get_mtime(ssl_options[key])
+    if db_type == "SQLite" and target.get('sqlite_file'):
+        files[target['sqlite_file']] = get_mtime(target['sqlite_file'])
+
+    fingerprint = {
+        'db_type': db_type,
+        'connection': connection,
+        'ssl_options': ssl_options,
+        'file_mtimes': files,
+        'addresses': resolve_addresses(host, port),
+    }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+# Function to load the state saved by the previous run
+def load_state(state_path):
+    try:
+        with open(state_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+# Function to save state atomically so an interrupted run never leaves a truncated file
+def save_state(state_path, state):
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(temp_path, state_path)
+
+# Function to decide whether a target needs checking, returning (check, reason)
+def needs_check(fingerprint, previous, max_age, now):
+    if not previous:
+        return True, "new target"
+    if previous.get('fingerprint') != fingerprint:
+        return True, "target changed"
+    if not previous.get('success'):
+        return True, "failed last time"
+    age = now - previous.get('checked_at', 0)
+    if age > max_age:
+        return True, f"last checked {int(age)}s ago (older than {max_age}s)"
+    return False, f"unchanged and passed {int(age)}s ago"
+
+# Function to check only the targets that changed, failed or went stale.
+# Returns one report entry per target, in target order.
+def run_incremental(targets, state_path=DEFAULT_STATE_PATH, max_age=DEFAULT_MAX_AGE, now=None, **verify_options):
+    now = time.time() if now is None else now
+    state = load_state(state_path)
+
+    with ThreadPoolExecutor(max_workers=RESOLVE_THREADS) as executor:
+        fingerprints = list(executor.map(fingerprint_target, targets))
+
+    report = []
+    to_check = []
+    for index, (target, fingerprint) in enumerate(zip(targets, fingerprints)):
+        key = target_key(target)
+        previous = state.get(key)
+        check, reason = needs_check(fingerprint, previous, max_age, now)
+        entry = {'index': index, 'key': key, 'checked': check, 'reason': reason}
+        if check:
+            to_check.append(index)
+        else:
+            entry['success'] = previous['success']
+            entry['message'] = previous['message']
+        report.append(entry)
+
+    outcomes = verify_targets([targets[index] for index in to_check], **verify_options) if to_check else []
+    for index, (success, message) in zip(to_check, outcomes):
+        report[index]['success'] = success
+        report[index]['message'] = message
+        state[report[index]['key']] = {
+            'fingerprint': fingerprints[index],
+            'success': success,
+            'message': message,
+            'checked_at': now,
+        }
+
+    save_state(state_path, state)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-check only database targets that changed, failed or went stale")
+    parser.add_argument("targets", help="JSON file containing a list of targets")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="File holding results of the previous run")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE, help="Seconds before a passing result is re-checked")
+    args = parser.parse_args(argv)
+
+    with open(args.targets) as f:
+        targets = json.load(f)
+
+    report = run_incremental(targets, args.state, args.max_age)
+    for entry in report:
+        print(json.dumps(entry))
+
+    checked = sum(entry['checked'] for entry in report)
+    print(f"Checked {checked} of {len(report)} targets, skipped {len(report) - checked}", file=sys.stderr)
+    return 0 if all(entry['success'] for entry in report) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import psycopg2
+import pymongo
+import pymysql
+import sqlalchemy
+
+from db_connections import (
+    build_mongodb_client_args,
+    build_mongodb_uri,
+    build_mssql_url,
+    build_mysql_conn_args,
+    build_mysql_uri_args,
+    build_oracle_url,
+    build_postgres_conn_args,
+    build_postgres_uri_args,
+    build_timeout_args,
+    set_oracle_call_timeout,
+)
+
+# Seconds between keepalive cycles
+DEFAULT_INTERVAL = 10
+
+# Seconds allowed to connect or to answer a liveness command
+DEFAULT_TIMEOUT = 10
+
+# Reconnect backoff: starts at BACKOFF_INITIAL seconds and doubles up to BACKOFF_MAX
+BACKOFF_INITIAL = 1
+BACKOFF_MAX = 300
+
+# Threads used to run one cycle across many targets
+DEFAULT_MAX_THREADS = 64
+
+# Function to open a long-lived MySQL connection
+def _connect_mysql(target, timeout):
+    if 'uri' in target:
+        conn_args = build_mysql_uri_args(target['uri'], target.get('ssl_options'))
+    else:
+        conn_args = build_mysql_conn_args(
+            target.get('host'), target.get('port'), target.get('username'),
+            target.get('password'), target.get('database'), target.get('ssl_options')
+        )
+    return pymysql.connect(**{**conn_args, **build_timeout_args("MySQL", timeout)})
+
+# Function to open a long-lived PostgreSQL connection
+def _connect_postgres(target, timeout):
+    if 'uri' in target:
+        conn_args = build_postgres_uri_args(target['uri'], target.get('ssl_options'))
+    else:
+        conn_args = build_postgres_conn_args(
+            target.get('host'), target.get('port'), target.get('username'),
+            target.get('password'), target.get('database'), target.get('ssl_options')
+        )
+    conn = psycopg2.connect(**{**conn_args, **build_timeout_args("PostgreSQL", timeout)})
+
+    # Without autocommit psycopg2 would send a BEGIN before every liveness query
+    conn.autocommit = True
+    return conn
+
+# Function to open a long-lived MongoDB client
+def _connect_mongodb(target, timeout):
+    if 'uri' in target:
+        client = pymongo.MongoClient(
+            build_mongodb_uri(target['uri'], target.get('ssl_options')),
+            maxPoolSize=1, **build_timeout_args("MongoDB", timeout)
+        )
+    else:
+        connection_string, conn_options = build_mongodb_client_args(
+            target.get('host'), target.get('port'), target.get('username'),
+            target.get('password'), target.get('database'), target.get('auth_source', "admin"),
+            target.get('ssl_options'), target.get('replica_set')
+        )
+        client = pymongo.MongoClient(
+            connection_string, maxPoolSize=1, **conn_options, **build_timeout_args("MongoDB", timeout)
+        )
+
+    # MongoClient connects lazily, so force the handshake now
+    client.admin.command('hello')
+    return client
+
+# Function to open a long-lived SQLAlchemy connection for Microsoft SQL Server
+def _connect_mssql(target, timeout):
+    conn_str = build_mssql_url(
+        target.get('host'), target.get('port'), target.get('username'), target.get('password'),
+        target.get('database'), target.get('uri'), target.get('ssl_options')
+    )
+    engine = sqlalchemy.create_engine(
+        conn_str, poolclass=sqlalchemy.pool.NullPool,
+        connect_args=build_timeout_args("Microsoft SQL Server", timeout)
+    )
+    conn = engine.connect()
+    # pyodbc query timeout, so a ping on a dead connection cannot block forever
+    conn.connection.dbapi_connection.timeout = max(1, int(timeout))
+    return conn
+
+# Function to open a long-lived SQLAlchemy connection for Oracle
+def _connect_oracle(target, timeout):
+    conn_str = build_oracle_url(
+        target.get('host'), target.get('port'), target.get('username'), target.get('password'),
+        target.get('service_name'), target.get('sid'), target.get('uri'), target.get('ssl_options')
+    )
+    if not conn_str:
+        raise ValueError("Either Service Name or SID must be provided for Oracle connection")
+    engine = sqlalchemy.create_engine(conn_str, poolclass=sqlalchemy.pool.NullPool)
+    # cx_Oracle has no connect timeout argument; call_timeout bounds every round trip after it
+    set_oracle_call_timeout(engine, timeout)
+    return engine.connect()
+
+# Function to open a long-lived SQLite connection
+def _connect_sqlite(target, timeout):
+    if 'uri' in target:
+        database_path = urlparse(target['uri']).path
+        if database_path.startswith('/'):
+            database_path = database_path[1:]  # Remove leading slash
+    else:
+        database_path = target.get('sqlite_file')
+    # Open read/write without creating, so a missing file is reported rather than created
+    return sqlite3.connect(f"file:{database_path}?mode=rw", uri=True, timeout=timeout, check_same_thread=False)
+
+# Liveness commands, each one round trip on an open connection
+def _ping_mysql(conn):
+    # COM_PING
+    conn.ping(reconnect=False)
+
+def _ping_postgres(conn):
+    # psycopg2 rejects an empty query on the client without sending it, so use
+    # SELECT 1; with autocommit on it is a single round trip
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+def _ping_mongodb(client):
+    client.admin.command('ping')
+
+def _ping_mssql(conn):
+    conn.exec_driver_sql("SELECT 1").scalar()
+
+def _ping_oracle(conn):
+    # Oracle before 23c needs a FROM clause
+    conn.exec_driver_sql("SELECT 1 FROM DUAL").scalar()
+
+def _ping_sqlite(conn):
+    conn.execute("SELECT 1").fetchone()
+
+# Connect and liveness functions per database type
+PROTOCOLS = {
+    "MySQL": (_connect_mysql, _ping_mysql),
+    "PostgreSQL": (_connect_postgres, _ping_postgres),
+    "MongoDB": (_connect_mongodb, _ping_mongodb),
+    "Microsoft SQL Server": (_connect_mssql, _ping_mssql),
+    "Oracle": (_connect_oracle, _ping_oracle),
+    "SQLite": (_connect_sqlite, _ping_sqlite),
+}
+
+# Holds one long-lived connection to a target and checks it with the
+# cheapest liveness command for its protocol
+class KeepaliveProbe:
+    def __init__(self, target, timeout=DEFAULT_TIMEOUT):
+        if target.get('db_type') not in PROTOCOLS:
+            raise ValueError(f"Unsupported database type: {target.get('db_type')}")
+        self.target = target
+        self.timeout = timeout
+        self.connect, self.ping = PROTOCOLS[target['db_type']]
+        self.conn = None
+        self.backoff = 0
+        self.next_attempt = 0
+        self.reconnects = 0
+        self.last_error = ""
+        self.lock = threading.Lock()
+
+    # Run one keepalive cycle. The liveness round trip and any reconnect are
+    # timed separately, so reconnect cost never shows up as liveness latency.
+    def probe(self, now=None):
+        # A probe that missed its deadline may still be running; report it rather than queue behind it
+        if not self.lock.acquire(blocking=False):
+            return {
+                'success': False,
+                'message': f"Timed out: previous {self.target['db_type']} liveness check is still running",
+                'rtt_ms': None,
+                'reconnected': False,
+                'connect_ms': None,
+            }
+        try:
+            now = time.monotonic() if now is None else now
+            result = {
+                'success': False,
+                'message': "",
+                'rtt_ms': None,
+                'reconnected': False,
+                'connect_ms': None,
+            }
+            db_type = self.target['db_type']
+
+            if self.conn is None:
+                if now < self.next_attempt:
+                    # Repeat the last error so the outcome stays the same while backing off
+                    result['message'] = f"{self.last_error} (reconnecting in {self.next_attempt - now:.1f}s)"
+                    return result
+                started = time.perf_counter()
+                try:
+                    self.conn = self.connect(self.target, self.timeout)
+                except Exception as e:
+                    self._schedule_reconnect(now)
+                    self.last_error = f"Error connecting to {db_type}: {str(e)}"
+                    result['message'] = self.last_error
+                    return result
+                result['connect_ms'] = (time.perf_counter() - started) * 1000
+                result['reconnected'] = True
+                self.reconnects += 1
+
+            started = time.perf_counter()
+            try:
+                self.ping(self.conn)
+            except Exception as e:
+                self.close()
+                self._schedule_reconnect(now)
+                self.last_error = f"{db_type} connection lost: {str(e)}"
+                result['message'] = self.last_error
+                return result
+
+            result['rtt_ms'] = (time.perf_counter() - started) * 1000
+            result['success'] = True
+            result['message'] = f"{db_type} is alive"
+            self.backoff = 0
+            return result
+        finally:
+            self.lock.release()
+
+    def _schedule_reconnect(self, now):
+        self.backoff = min(BACKOFF_MAX, self.backoff * 2 if self.backoff else BACKOFF_INITIAL)
+        # Jitter so targets that dropped together do not reconnect in lockstep
+        self.next_attempt = now + self.backoff * random.uniform(0.5, 1)
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+# Function to get the seconds a probe may run: one connect plus one liveness command
+def probe_deadline(timeout=DEFAULT_TIMEOUT):
+    return 2 * timeout + 1
+
+# Function to run one keepalive cycle across many probes, returning results in probe order.
+# A probe still running deadline seconds after it started is reported as timed out,
+# so one black-holed host cannot hold up the whole cycle.
+def probe_all(probes, executor, deadline=None):
+    deadline = probe_deadline() if deadline is None else deadline
+    started = [None] * len(probes)
+
+    def run(index):
+        started[index] = time.monotonic()
+        return probes[index].probe()
+
+    futures = [executor.submit(run, index) for index in range(len(probes))]
+    results = [None] * len(probes)
+    pending = set(range(len(probes)))
+    while pending:
+        now = time.monotonic()
+        for index in list(pending):
+            if futures[index].done():
+                results[index] = futures[index].result()
+                pending.discard(index)
+            elif started[index] is not None and now - started[index] >= deadline:
+                results[index] = {
+                    'success': False,
+                    'message': f"Timed out after {deadline}s waiting for {probes[index].target['db_type']} liveness check",
+                    'rtt_ms': None,
+                    'reconnected': False,
+                    'connect_ms': None,
+                }
+                pending.discard(index)
+        if pending:
+            # Wake for the next completion or the earliest deadline, whichever comes first
+            running = [started[index] + deadline - now for index in pending if started[index] is not None]
+            wait([futures[index] for index in pending], timeout=max(0.01, min(running, default=deadline)),
+                 return_when=FIRST_COMPLETED)
+    return results
+
+# Function to run keepalive cycles until stop_event is set or cycles have run.
+# on_results is called with the list of results after every cycle.
+def run_keepalive(targets, on_results, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT,
+                  max_threads=DEFAULT_MAX_THREADS, stop_event=None, cycles=None):
+    probes = [KeepaliveProbe(target, timeout) for target in targets]
+    stop_event = stop_event or threading.Event()
+    completed = 0
+    executor = ThreadPoolExecutor(max_workers=max_threads)
+    try:
+        while not stop_event.is_set() and (cycles is None or completed < cycles):
+            started = time.monotonic()
+            on_results(probe_all(probes, executor, probe_deadline(timeout)))
+            completed += 1
+            if cycles is None or completed < cycles:
+                stop_event.wait(max(0, interval - (time.monotonic() - started)))
+    finally:
+        # Don't wait for probes that missed their deadline; driver timeouts end them
+        executor.shutdown(wait=False, cancel_futures=True)
+        for probe in probes:
+            probe.close()
@@ -0,0 +1,176 @@
+import json
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from fleet_monitor import FleetMonitor, status_grid, update_latency_buckets
+from result_buffer import BACKENDS
+
+# Maximum points per latency trace; older data is downsampled into wider buckets
+MAX_CHART_POINTS = 500
+
+# Configure page
+st.set_page_config(
+    page_title="Fleet Dashboard",
+    page_icon="🔌",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+st.title("Fleet Dashboard")
+st.markdown("Continuously verify connections to a whole fleet of databases")
+
+# One monitor per targets file, shared by every session and kept across reruns.
+# Switching files in one session leaves other files' monitors to their users.
+@st.cache_resource
+def get_monitor(targets_path):
+    with open(targets_path) as f:
+        targets = json.load(f)
+    return FleetMonitor(targets)
+
+# Probe settings belong to the shared monitor, so they are applied only when
+# this session changes them, never on every rerun
+def apply_interval(key):
+    monitor.interval = st.session_state[key]
+
+def apply_keepalive(key):
+    monitor.set_keepalive(st.session_state[key])
+
+# Sidebar settings
+with st.sidebar:
+    targets_path = st.text_input("Targets File", "targets.json", help="JSON file containing a list of targets")
+
+try:
+    monitor = get_monitor(targets_path)
+except (OSError, ValueError) as e:
+    st.error(f"Could not load targets from {targets_path}: {str(e)}")
+    st.stop()
+
+with st.sidebar:
+    interval_key = f"fleet_interval:{targets_path}"
+    st.number_input(
+        "Probe Interval (seconds)", min_value=5, value=monitor.interval,
+        key=interval_key, on_change=apply_interval, args=(interval_key,)
+    )
+    refresh_interval = st.number_input("Refresh Interval (seconds)", min_value=1, value=5)
+    window_minutes = st.number_input("Chart Window (minutes)", min_value=1, value=60)
+    keepalive_key = f"fleet_keepalive:{targets_path}"
+    st.checkbox(
+        "Keepalive Mode", value=monitor.keepalive, key=keepalive_key,
+        on_change=apply_keepalive, args=(keepalive_key,),
+        help="Hold one connection per target and send only a liveness command each cycle"
+    )
+    st.caption(
+        f"Shared by everyone viewing {targets_path}: probing every {monitor.interval}s, "
+        f"keepalive {'on' if monitor.keepalive else 'off'}"
+    )
+
+start_col, stop_col = st.sidebar.columns(2)
+if start_col.button("Start", type="primary", use_container_width=True):
+    monitor.start()
+if stop_col.button("Stop", use_container_width=True):
+    monitor.stop()
+
+# Only this fragment reruns on each refresh; the rest of the script runs once per interaction
+@st.fragment(run_every=refresh_interval)
+def fleet_view():
+    cycle, status, changed_in, messages = monitor.snapshot()
+    # Session caches below belong to one monitor; switching files starts them afresh
+    seen_monitor, seen_cycle = st.session_state.get('fleet_seen_cycle', (None, 0))
+    if seen_monitor != id(monitor):
+        seen_cycle = 0
+
+    # Summary metrics
+    failing = int((status > 0).sum())
+    pending = int((status < 0).sum())
+    metric_cols = st.columns(5)
+    metric_cols[0].metric("Targets", len(status))
+    metric_cols[1].metric("Passing", len(status) - failing - pending)
+    metric_cols[2].metric("Failing", failing)
+    metric_cols[3].metric("Pending", pending)
+    metric_cols[4].metric("Probe Cycle", cycle, "running" if monitor.is_running() else "stopped")
+    if monitor.keepalive:
+        st.caption(f"Keepalive mode: {int(monitor.reconnects.sum())} connections opened so far")
+
+    # Status grid, one cell per target. The figure keeps its uirevision so
+    # refreshes update the colours without resetting zoom or hover state.
+    grid = status_grid(status)
+    labels = [f"{key}<br>{message}" for key, message in zip(monitor.keys, messages)]
+    labels += [""] * (grid.size - len(labels))
+    grid_figure = go.Figure(go.Heatmap(
+        z=grid,
+        text=[labels[row * grid.shape[1]:(row + 1) * grid.shape[1]] for row in range(grid.shape[0])],
+        hoverinfo="text",
+        zmin=0,
+        zmax=2,
+        colorscale=[[0, "#bdbdbd"], [0.5, "#2e7d32"], [1, "#c62828"]],
+        showscale=False,
+        xgap=1,
+        ygap=1,
+    ))
+    grid_figure.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=0, b=0),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, autorange="reversed"),
+        uirevision="fleet-grid",
+    )
+    st.plotly_chart(grid_figure, use_container_width=True, key="fleet_grid")
+
+    # Only targets whose status changed since this session last looked
+    changes = monitor.changes_since(seen_cycle)
+    with st.expander(f"Changed Since Last Refresh ({len(changes)})", expanded=bool(len(changes))):
+        st.dataframe(changes, use_container_width=True, hide_index=True)
+    st.session_state['fleet_seen_cycle'] = (id(monitor), cycle)
+
+    # Latency over time, downsampled server-side. Closed buckets are cached in the
+    # session, so each refresh only aggregates points from the newest bucket on.
+    window_seconds = window_minutes * 60
+    bucket_seconds = max(monitor.interval, window_seconds / MAX_CHART_POINTS)
+    # Keepalive round trips and fresh-connection latencies are different measures,
+    # so the charts follow the stage measured in the monitor's current mode
+    stage = monitor.latency_stage()
+    bucket_key = (id(monitor), bucket_seconds, stage)
+    if st.session_state.get('fleet_bucket_key') != bucket_key:
+        st.session_state['fleet_buckets'] = None
+        st.session_state['fleet_last_bucket'] = None
+        st.session_state['fleet_bucket_key'] = bucket_key
+
+    buckets, last_bucket = update_latency_buckets(
+        monitor, st.session_state['fleet_buckets'], st.session_state['fleet_last_bucket'], bucket_seconds, stage
+    )
+    buckets = buckets[buckets['bucket'] >= time.time() - window_seconds]
+    st.session_state['fleet_buckets'] = buckets
+    st.session_state['fleet_last_bucket'] = last_bucket
+
+    latency_figure = go.Figure()
+    for backend, rows in buckets.groupby('backend'):
+        x = pd.to_datetime(rows['bucket'], unit="s")
+        latency_figure.add_trace(go.Scattergl(
+            x=x, y=rows['median'], mode="lines", name=f"{BACKENDS[backend]} median"
+        ))
+        latency_figure.add_trace(go.Scattergl(
+            x=x, y=rows['max'], mode="lines", name=f"{BACKENDS[backend]} max", line=dict(dash="dot")
+        ))
+    latency_figure.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=30, b=0),
+        yaxis_title="Latency (ms)",
+        uirevision="fleet-latency",
+    )
+    st.subheader("Liveness Round Trip Over Time" if stage == 'query' else "Latency Over Time")
+    st.plotly_chart(latency_figure, use_container_width=True, key="fleet_latency")
+
+    # Per-backend aggregates over the chart window
+    since = time.time() - window_seconds
+    rate_col, percentile_col = st.columns(2)
+    with rate_col:
+        st.subheader("Error Rate")
+        st.dataframe(monitor.error_rates(since), use_container_width=True)
+    with percentile_col:
+        st.subheader("Latency Percentiles (ms)")
+        st.dataframe(monitor.latency_percentiles(since, stage), use_container_width=True)
+
+fleet_view()
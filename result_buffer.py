@@ -0,0 +1,187 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Number of results kept before the oldest are overwritten
+DEFAULT_CAPACITY = 1_000_000
+
+# Backends, stored as their index in this list
+BACKENDS = ["MySQL", "PostgreSQL", "MongoDB", "SQLite", "Microsoft SQL Server", "Oracle"]
+
+# Outcome codes, stored as their index in this list
+OUTCOMES = ["success", "timeout", "refused", "dns", "auth", "ssl", "unknown_database", "error"]
+OUTCOME_SUCCESS = 0
+
+# Keywords used to classify failure messages, checked in order
+OUTCOME_KEYWORDS = [
+    ("timeout", ["timed out", "timeout"]),
+    ("refused", ["refused", "unreachable", "no route to host"]),
+    ("dns", ["name or service not known", "nodename nor servname", "getaddrinfo", "could not translate host name"]),
+    ("ssl", ["ssl", "tls", "certificate"]),
+    ("auth", ["authentication", "access denied", "password", "login failed", "not authorized"]),
+    ("unknown_database", ["unknown database", "does not exist", "not found"]),
+]
+
+# Per-stage latencies, in milliseconds; NaN when a stage was not measured
+STAGES = ["resolve", "connect", "query", "total"]
+
+# Function to map a (success, message) result to an outcome code
+def classify_outcome(success, message):
+    if success:
+        return OUTCOME_SUCCESS
+    text = (message or "").lower()
+    for outcome, keywords in OUTCOME_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return OUTCOMES.index(outcome)
+    return OUTCOMES.index("error")
+
+# Fixed-size ring buffer of probe results stored as typed numpy columns
+class ResultBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.target_ids = np.zeros(capacity, dtype=np.uint32)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.backends = np.zeros(capacity, dtype=np.uint8)
+        self.outcomes = np.zeros(capacity, dtype=np.uint8)
+        self.latencies = {stage: np.full(capacity, np.nan, dtype=np.float32) for stage in STAGES}
+        self.next_index = 0
+        self.size = 0
+        # Target keys are interned once, so each result only stores an integer id
+        self.target_keys = []
+        self.target_lookup = {}
+
+    def __len__(self):
+        return self.size
+
+    # Get the integer id for a target key, assigning one on first use
+    def target_id(self, key):
+        target_id = self.target_lookup.get(key)
+        if target_id is None:
+            target_id = len(self.target_keys)
+            self.target_keys.append(key)
+            self.target_lookup[key] = target_id
+        return target_id
+
+    # Append one result; latencies is a dict of stage name to milliseconds
+    def append(self, target_id, backend, outcome, latencies=None, timestamp=None):
+        index = self.next_index
+        self.target_ids[index] = target_id
+        self.timestamps[index] = time.time() if timestamp is None else timestamp
+        self.backends[index] = backend if isinstance(backend, (int, np.integer)) else BACKENDS.index(backend)
+        self.outcomes[index] = outcome
+        latencies = latencies or {}
+        for stage in STAGES:
+            self.latencies[stage][index] = latencies.get(stage, np.nan)
+        self.next_index = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    # Append a (success, message) result for a target, classifying the message
+    def record(self, key, backend, success, message, latencies=None, timestamp=None):
+        self.append(self.target_id(key), backend, classify_outcome(success, message), latencies, timestamp)
+
+    # Append many results at once from equal-length arrays
+    def append_many(self, target_ids, backends, outcomes, latencies=None, timestamps=None):
+        count = len(target_ids)
+        if count == 0:
+            return
+        if timestamps is None:
+            timestamps = np.full(count, time.time())
+        latencies = latencies or {}
+
+        # Only the newest results survive when more than the capacity is appended
+        start = 0
+        if count > self.capacity:
+            start = count - self.capacity
+            count = self.capacity
+        positions = (self.next_index + np.arange(count)) % self.capacity
+
+        self.target_ids[positions] = np.asarray(target_ids)[start:]
+        self.timestamps[positions] = np.asarray(timestamps)[start:]
+        self.backends[positions] = np.asarray(backends)[start:]
+        self.outcomes[positions] = np.asarray(outcomes)[start:]
+        for stage in STAGES:
+            values = latencies.get(stage)
+            self.latencies[stage][positions] = np.nan if values is None else np.asarray(values)[start:]
+
+        self.next_index = (self.next_index + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    # Get the filled part of each column. These are views, not copies, and are in
+    # storage order; pass ordered=True to get oldest-first copies once the buffer wraps.
+    def columns(self, ordered=False):
+        columns = {
+            'target_id': self.target_ids,
+            'timestamp': self.timestamps,
+            'backend': self.backends,
+            'outcome': self.outcomes,
+        }
+        columns.update({f"{stage}_ms": values for stage, values in self.latencies.items()})
+
+        if ordered and self.size == self.capacity and self.next_index:
+            return {name: np.concatenate([values[self.next_index:], values[:self.next_index]]) for name, values in columns.items()}
+        return {name: values[:self.size] for name, values in columns.items()}
+
+    # Export the results as a DataFrame backed by the buffer's own arrays
+    def to_dataframe(self, ordered=False):
+        return pd.DataFrame(self.columns(ordered), copy=False)
+
+    # Function to get group codes and labels for a group-by column
+    def _groups(self, by, columns):
+        if by == 'backend':
+            return columns['backend'].astype(np.intp), BACKENDS
+        if by == 'target':
+            return columns['target_id'].astype(np.intp), self.target_keys
+        if by == 'outcome':
+            return columns['outcome'].astype(np.intp), OUTCOMES
+        raise ValueError(f"Unsupported group-by column: {by}")
+
+    # Function to select the filled rows, optionally only those at or after since
+    def _select(self, since=None):
+        columns = self.columns()
+        if since is None:
+            return columns
+        mask = columns['timestamp'] >= since
+        return {name: values[mask] for name, values in columns.items()}
+
+    # Latency percentiles per group, computed with one sort for all groups
+    def percentiles(self, stage="total", by='backend', q=(50, 95, 99), since=None):
+        columns = self._select(since)
+        groups, labels = self._groups(by, columns)
+        values = columns[f"{stage}_ms"]
+
+        measured = ~np.isnan(values)
+        groups = groups[measured]
+        values = values[measured].astype(np.float64)
+
+        order = np.lexsort((values, groups))
+        groups = groups[order]
+        values = values[order]
+
+        present, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+        result = {}
+        for percentile in q:
+            # Linear interpolation between closest ranks, as np.percentile does by default
+            rank = starts + (counts - 1) * (percentile / 100)
+            lower = np.floor(rank).astype(np.intp)
+            upper = np.minimum(lower + 1, starts + counts - 1)
+            fraction = rank - lower
+            result[f"p{percentile}"] = values[lower] + (values[upper] - values[lower]) * fraction
+        result['count'] = counts
+
+        return pd.DataFrame(result, index=pd.Index([labels[code] for code in present], name=by))
+
+    # Share of non-successful results per group
+    def error_rates(self, by='backend', since=None):
+        columns = self._select(since)
+        groups, labels = self._groups(by, columns)
+        failures = columns['outcome'] != OUTCOME_SUCCESS
+
+        totals = np.bincount(groups, minlength=len(labels))
+        errors = np.bincount(groups, weights=failures, minlength=len(labels))
+        present = np.flatnonzero(totals)
+
+        return pd.DataFrame(
+            {'error_rate': errors[present] / totals[present], 'errors': errors[present].astype(np.int64), 'count': totals[present]},
+            index=pd.Index([labels[code] for code in present], name=by)
+        )
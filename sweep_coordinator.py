@@ -0,0 +1,364 @@
+import argparse
+import json
+import multiprocessing
+import hmac
+import ipaddress
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+from async_verify import DEFAULT_TIMEOUT, verify_targets
+
+# Number of targets handed to a worker per request. Small batches keep
+# stealing fine-grained when some shards are full of slow targets.
+DEFAULT_BATCH_SIZE = 50
+
+# Number of local worker processes started by run_sweep
+DEFAULT_WORKERS = 4
+
+# Seconds a worker waits before asking again when all remaining work is in flight elsewhere
+WAIT_INTERVAL = 0.5
+
+# Seconds a worker keeps retrying to reach the coordinator
+CONNECT_TIMEOUT = 30
+
+# Seconds a worker may hold a batch before it is handed to another worker
+DEFAULT_LEASE_SECONDS = 4 * DEFAULT_TIMEOUT
+
+# Seconds a whole sweep may take; targets not checked by then are reported as failed
+DEFAULT_SWEEP_DEADLINE = 3600
+
+# Default coordinator address. Targets carry credentials, so listening on other
+# interfaces requires a worker token.
+DEFAULT_BIND = "127.0.0.1:7420"
+
+# Message for targets that had no result when the sweep deadline passed
+DEADLINE_MESSAGE = "Not checked before the sweep deadline"
+
+# Function to split target indices into contiguous shards of near-equal size
+def split_shards(count, shard_count):
+    shard_count = max(1, min(shard_count, count or 1))
+    size, extra = divmod(count, shard_count)
+    shards = []
+    start = 0
+    for shard in range(shard_count):
+        end = start + size + (1 if shard < extra else 0)
+        shards.append(deque(range(start, end)))
+        start = end
+    return shards
+
+# Tracks shards, hands out batches and merges results in target order.
+# Every batch handed out is a lease; a lease that is not returned before its
+# deadline, e.g. because its worker hung, is put back for other workers to take.
+class SweepCoordinator:
+    def __init__(self, targets, shard_count=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE, token=None,
+                 lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.targets = list(targets)
+        self.results = [None] * len(self.targets)
+        self.shards = split_shards(len(self.targets), shard_count)
+        self.batch_size = batch_size
+        self.token = token
+        self.lease_seconds = lease_seconds
+        self.leases = {}
+        self.next_lease = 0
+        self.remaining = len(self.targets)
+        self.next_shard = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not self.remaining:
+            self.done.set()
+
+    # Check a worker's token without leaking its contents through timing
+    def check_token(self, token):
+        if not self.token:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    # Give each new worker its own shard; workers beyond the shard count only steal
+    def claim_shard(self):
+        with self.lock:
+            if self.next_shard >= len(self.shards):
+                return None
+            shard = self.next_shard
+            self.next_shard += 1
+            return shard
+
+    # Take a batch from the worker's own shard, or steal from the back of the largest other shard.
+    # Returns (lease_id, indices); lease_id is None when there is nothing to hand out.
+    def take_batch(self, shard, now=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._expire_leases(now)
+
+            if shard is not None and self.shards[shard]:
+                queue = self.shards[shard]
+                batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            else:
+                victim = max(self.shards, key=len)
+                if not victim:
+                    return None, []
+                count = min(self.batch_size, (len(victim) + 1) // 2)
+                batch = [victim.pop() for _ in range(count)]
+                batch.reverse()
+
+            lease_id = self.next_lease
+            self.next_lease += 1
+            self.leases[lease_id] = (batch, shard, now + self.lease_seconds)
+            return lease_id, batch
+
+    # Put a leased batch back, e.g. when its worker disconnects mid-batch
+    def release_lease(self, lease_id, requeue=True):
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+            if lease and requeue:
+                self._requeue(*lease[:2])
+
+    def _expire_leases(self, now):
+        for lease_id, (indices, shard, deadline) in list(self.leases.items()):
+            if deadline <= now:
+                del self.leases[lease_id]
+                self._requeue(indices, shard)
+
+    def _requeue(self, indices, shard):
+        # Skip targets that already have a result, e.g. from an earlier copy of the batch
+        indices = [index for index in indices if self.results[index] is None]
+        if not indices:
+            return
+        queue = self.shards[shard] if shard is not None else max(self.shards, key=len)
+        queue.extendleft(reversed(sorted(indices)))
+
+    def record_results(self, results):
+        with self.lock:
+            for index, success, message in results:
+                if self.results[index] is None:
+                    self.remaining -= 1
+                self.results[index] = (success, message)
+            if not self.remaining:
+                self.done.set()
+
+    # Fill in every target still without a result, e.g. when the sweep deadline passes
+    def finish(self, message):
+        with self.lock:
+            for index, result in enumerate(self.results):
+                if result is None:
+                    self.results[index] = (False, message)
+            self.remaining = 0
+            self.done.set()
+
+    def is_finished(self):
+        return self.done.is_set()
+
+# Function to send one newline-delimited JSON message
+def send_message(stream, message):
+    stream.write((json.dumps(message) + "\n").encode("utf-8"))
+    stream.flush()
+
+# Function to read one newline-delimited JSON message, or None when the peer has gone
+def read_message(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+# Function to keep only well-formed results for targets in the worker's current batch
+def filter_results(results, batch):
+    batch = set(batch)
+    return [
+        result for result in results
+        if isinstance(result, list) and len(result) == 3
+        and type(result[0]) is int and result[0] in batch
+        and isinstance(result[1], bool) and isinstance(result[2], str)
+    ]
+
+# Handles one worker connection for the lifetime of the worker
+class WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        lease_id = None
+        in_flight = []
+        try:
+            hello = read_message(self.rfile)
+            if not isinstance(hello, dict) or hello.get("type") != "hello":
+                return
+            if not coordinator.check_token(hello.get("token")):
+                send_message(self.wfile, {"type": "error", "message": "Invalid worker token"})
+                return
+
+            shard = coordinator.claim_shard()
+            send_message(self.wfile, {"type": "welcome", "shard": shard})
+
+            while True:
+                message = read_message(self.rfile)
+                if not isinstance(message, dict):
+                    break
+
+                if message.get("type") == "results":
+                    results = message.get("results")
+                    coordinator.record_results(filter_results(results if isinstance(results, list) else [], in_flight))
+                    coordinator.release_lease(lease_id)
+                    lease_id, in_flight = None, []
+
+                if coordinator.is_finished():
+                    send_message(self.wfile, {"type": "done"})
+                    break
+
+                lease_id, in_flight = coordinator.take_batch(shard)
+                if in_flight:
+                    items = [[index, coordinator.targets[index]] for index in in_flight]
+                    send_message(self.wfile, {"type": "work", "items": items})
+                else:
+                    send_message(self.wfile, {"type": "wait", "seconds": WAIT_INTERVAL})
+        except (OSError, ValueError):
+            pass
+        finally:
+            if lease_id is not None:
+                coordinator.release_lease(lease_id)
+
+class SweepServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, coordinator):
+        super().__init__(address, WorkerHandler)
+        self.coordinator = coordinator
+
+# Function to connect to the coordinator, retrying while it starts up
+def connect_to_coordinator(host, port, timeout=CONNECT_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(WAIT_INTERVAL)
+
+# Function to run a worker until the coordinator reports the sweep is done
+def run_worker(host, port, token=None, **verify_options):
+    with connect_to_coordinator(host, port) as sock:
+        stream = sock.makefile("rwb")
+        send_message(stream, {"type": "hello", "token": token})
+        welcome = read_message(stream)
+        if not welcome or welcome.get("type") != "welcome":
+            raise RuntimeError((welcome or {}).get("message", "Coordinator refused the worker"))
+
+        send_message(stream, {"type": "next"})
+        while True:
+            message = read_message(stream)
+            if message is None or message.get("type") == "done":
+                break
+
+            if message.get("type") == "wait":
+                time.sleep(message.get("seconds", WAIT_INTERVAL))
+                send_message(stream, {"type": "next"})
+                continue
+
+            items = message.get("items", [])
+            outcomes = verify_targets([target for _, target in items], **verify_options)
+            results = [
+                [index, success, text]
+                for (index, _), (success, text) in zip(items, outcomes)
+            ]
+            send_message(stream, {"type": "results", "results": results})
+
+# Function to sweep targets with local worker processes and return results in target order
+def run_sweep(targets, workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE, address=("127.0.0.1", 0), token=None,
+              lease_seconds=DEFAULT_LEASE_SECONDS, deadline=DEFAULT_SWEEP_DEADLINE):
+    coordinator = SweepCoordinator(targets, workers, batch_size, token, lease_seconds)
+    if coordinator.is_finished():
+        return coordinator.results
+
+    with SweepServer(address, coordinator) as server:
+        host, port = server.server_address[:2]
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_worker, args=(host, port, token), daemon=True)
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        serve_thread.start()
+        stop_at = time.monotonic() + deadline
+        try:
+            # Stop early if every worker has died with work still outstanding
+            while not coordinator.done.wait(WAIT_INTERVAL):
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError("All sweep workers exited before the sweep finished")
+                if time.monotonic() >= stop_at:
+                    coordinator.finish(DEADLINE_MESSAGE)
+        finally:
+            server.shutdown()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+    return coordinator.results
+
+# Function to parse a host:port argument
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+# Function to check whether a bind host only accepts local connections
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded database connection sweep")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="Serve targets to workers and print the merged report")
+    coordinator_parser.add_argument("targets", help="JSON file containing a list of targets")
+    coordinator_parser.add_argument("--bind", default=DEFAULT_BIND, help="Address to listen on (host:port)")
+    coordinator_parser.add_argument("--shards", type=int, default=DEFAULT_WORKERS, help="Number of shards to split targets into")
+    coordinator_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    coordinator_parser.add_argument("--token", help="Shared token workers must present; required unless binding to loopback")
+    coordinator_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="Seconds before an unfinished batch is handed to another worker")
+    coordinator_parser.add_argument("--deadline", type=float, default=DEFAULT_SWEEP_DEADLINE, help="Seconds before unchecked targets are reported as failed")
+
+    worker_parser = subparsers.add_parser("worker", help="Verify targets served by a coordinator")
+    worker_parser.add_argument("--connect", required=True, help="Coordinator address (host:port)")
+    worker_parser.add_argument("--token", help="Shared token to present to the coordinator")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        host, port = parse_address(args.connect)
+        run_worker(host, port, args.token)
+        return 0
+
+    bind = parse_address(args.bind)
+    if not args.token and not is_loopback(bind[0]):
+        parser.error("--token is required when binding to a non-loopback address")
+
+    with open(args.targets) as f:
+        targets = json.load(f)
+
+    coordinator = SweepCoordinator(targets, args.shards, args.batch_size, args.token, args.lease)
+    with SweepServer(bind, coordinator) as server:
+        serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        serve_thread.start()
+        if not coordinator.done.wait(args.deadline):
+            coordinator.finish(DEADLINE_MESSAGE)
+        server.shutdown()
+
+    # Print the merged report in target order, one JSON object per line
+    failures = 0
+    for index, (success, message) in enumerate(coordinator.results):
+        failures += not success
+        print(json.dumps({"index": index, "db_type": targets[index].get("db_type"), "success": success, "message": message}))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
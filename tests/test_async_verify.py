@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+
+import async_verify
+from async_verify import get_async_check, verify_targets
+from db_connections import build_mysql_uri_args, build_postgres_uri_args, verify_target
+
+
+def sqlite_target(tmp_path, name="app.db"):
+    path = tmp_path / name
+    sqlite3.connect(path).close()
+    return {'db_type': "SQLite", 'sqlite_file': str(path)}
+
+
+def test_get_async_check_routes_by_driver_and_target(monkeypatch):
+    monkeypatch.setattr(async_verify, "asyncpg", object())
+    monkeypatch.setattr(async_verify, "aiomysql", object())
+    monkeypatch.setattr(async_verify, "AsyncMongoClient", object())
+
+    postgres = {'db_type': "PostgreSQL", 'host': "db", 'port': 5432}
+    assert get_async_check(postgres) is async_verify.async_test_postgres_connection
+    assert get_async_check({'db_type': "MySQL", 'uri': "mysql://u@db/app"}) is async_verify.async_test_mysql_connection
+    assert get_async_check({'db_type': "MongoDB", 'uri': "mongodb://db"}) is async_verify.async_test_mongodb_connection
+
+    # URI query options and SSL options on a URI are only handled by the sync path
+    assert get_async_check({'db_type': "MySQL", 'uri': "mysql://u@db/app?ssl_ca=/ca.pem"}) is None
+    assert get_async_check({'db_type': "PostgreSQL", 'uri': "postgresql://db/app", 'ssl_options': {'use_ssl': True}}) is None
+
+    # Drivers without async support, and targets the dispatch logic must reject
+    assert get_async_check({'db_type': "SQLite", 'sqlite_file': "app.db"}) is None
+    assert get_async_check({'db_type': "Oracle", 'host': "db", 'port': 1521}) is None
+    assert get_async_check({'db_type': "PostgreSQL", 'uri': "mysql://db/app"}) is None
+    assert get_async_check({'db_type': "PostgreSQL", 'host': "db"}) is None
+
+
+def test_get_async_check_falls_back_without_async_drivers(monkeypatch):
+    for name in ("asyncpg", "psycopg", "aiomysql", "AsyncMongoClient"):
+        monkeypatch.setattr(async_verify, name, None)
+    for db_type in ("PostgreSQL", "MySQL", "MongoDB"):
+        assert get_async_check({'db_type': db_type, 'host': "db", 'port': 1}) is None
+
+
+def test_verify_targets_keeps_target_order(tmp_path):
+    targets = [
+        sqlite_target(tmp_path, "first.db"),
+        {'db_type': "SQLite", 'sqlite_file': str(tmp_path / "missing.db")},
+        sqlite_target(tmp_path, "second.db"),
+    ]
+    results = verify_targets(targets, max_threads=2, timeout=5)
+    assert [success for success, _ in results] == [True, False, True]
+    assert "not found" in results[1][1]
+
+
+def test_hung_checks_time_out_without_holding_up_the_queue(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def fake_verify_target(target, timeout=None):
+        if target.get('hang'):
+            release.wait(20)
+        return True, "ok"
+
+    monkeypatch.setattr(async_verify, "verify_target", fake_verify_target)
+    targets = [dict(sqlite_target(tmp_path), hang=True) for _ in range(2)] + [sqlite_target(tmp_path)] * 3
+
+    started = time.monotonic()
+    try:
+        results = verify_targets(targets, max_threads=2, timeout=1)
+    finally:
+        release.set()
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 5
+    assert not any(success for success, _ in results)
+    assert all("Timed out after 1 seconds" in message for _, message in results)
+
+
+def test_uri_ssl_options_are_applied_without_mutating_the_url():
+    assert build_postgres_uri_args(
+        "postgresql://u:secret@db:5433/app?application_name=x", {'use_ssl': True, 'ssl_verify': "Verify Full"}
+    ) == {'host': "db", 'port': 5433, 'user': "u", 'password': "secret", 'dbname': "app",
+          'application_name': "x", 'sslmode': "verify-full"}
+
+    conn_args = build_mysql_uri_args("mysql://u:secret@db/app?ssl_ca=/ca.pem", {'use_ssl': True, 'client_cert': "/c.pem"})
+    assert conn_args['password'] == "secret"
+    assert conn_args['ssl'] == {'ca': "/ca.pem", 'cert': "/c.pem"}
+
+    # An unreachable server must be reported as such, not as a URL-building error
+    success, message = verify_target(
+        {'db_type': "PostgreSQL", 'uri': "postgresql://u:p@127.0.0.1:1/app", 'ssl_options': {'use_ssl': True}}, timeout=2
+    )
+    assert not success
+    assert "immutable" not in message and "refused" in message.lower()
@@ -0,0 +1,74 @@
+import sqlite3
+
+import incremental_verify
+from incremental_verify import needs_check, normalize_uri, run_incremental, target_key
+
+
+def test_normalize_uri_ignores_case_default_port_and_query_order():
+    assert normalize_uri("POSTGRES://u:p@DB.example/app?b=1&a=2", "PostgreSQL") == \
+        normalize_uri("postgres://u:p@db.example:5432/app?a=2&b=1", "PostgreSQL")
+
+
+def test_target_key_matches_fingerprint_normalization():
+    implicit = {'db_type': "PostgreSQL", 'uri': "postgres://u:p@db/app"}
+    explicit = {'db_type': "PostgreSQL", 'uri': "postgres://u:other@DB:5432/app"}
+    assert target_key(implicit) == target_key(explicit)
+
+    details = {'db_type': "MySQL", 'host': "DB", 'port': "3306", 'username': "u"}
+    assert target_key(details) == target_key({'db_type': "MySQL", 'host': "db", 'port': 3306, 'username': "u"})
+
+
+def test_target_key_keeps_uris_with_different_options_apart():
+    require = {'db_type': "PostgreSQL", 'uri': "postgres://u@db/app?sslmode=require"}
+    verify = {'db_type': "PostgreSQL", 'uri': "postgres://u@db/app?sslmode=verify-full"}
+    assert target_key(require) != target_key(verify)
+
+
+def test_target_key_keeps_targets_with_different_ssl_settings_apart():
+    uri = {'db_type': "PostgreSQL", 'uri': "postgres://u@db/app"}
+    assert target_key(uri) != target_key(dict(uri, ssl_options={'use_ssl': True, 'ssl_verify': "Verify Full"}))
+
+    details = {'db_type': "MongoDB", 'host': "db", 'port': 27017, 'username': "u"}
+    assert target_key(details) != target_key(dict(details, ssl_options={'use_ssl': True}))
+    assert target_key(details) != target_key(dict(details, replica_set="rs0"))
+    assert target_key(details) != target_key(dict(details, auth_source="orders"))
+    assert target_key(details) == target_key(dict(details, password="changed"))
+
+
+def test_target_key_prefers_explicit_id():
+    assert target_key({'id': "orders-primary", 'db_type': "MySQL", 'uri': "mysql://db/x"}) == "orders-primary"
+
+
+def test_needs_check_reasons():
+    passed = {'fingerprint': "abc", 'success': True, 'checked_at': 100}
+    assert needs_check("abc", None, 60, 110) == (True, "new target")
+    assert needs_check("xyz", passed, 60, 110) == (True, "target changed")
+    assert needs_check("abc", dict(passed, success=False), 60, 110) == (True, "failed last time")
+    assert needs_check("abc", passed, 60, 200) == (True, "last checked 100s ago (older than 60s)")
+    assert needs_check("abc", passed, 60, 130) == (False, "unchanged and passed 30s ago")
+
+
+def test_run_incremental_skips_unchanged_passing_targets(tmp_path, monkeypatch):
+    database = tmp_path / "app.db"
+    sqlite3.connect(database).close()
+    state_path = str(tmp_path / "state.json")
+    targets = [
+        {'db_type': "SQLite", 'sqlite_file': str(database)},
+        {'db_type': "SQLite", 'sqlite_file': str(tmp_path / "missing.db")},
+    ]
+
+    first = run_incremental(targets, state_path, max_age=60, now=1000)
+    assert [entry['checked'] for entry in first] == [True, True]
+    assert [entry['success'] for entry in first] == [True, False]
+
+    second = run_incremental(targets, state_path, max_age=60, now=1030)
+    assert [entry['reason'] for entry in second] == ["unchanged and passed 30s ago", "failed last time"]
+    assert second[0]['success'] and not second[0]['checked']
+
+    third = run_incremental(targets, state_path, max_age=60, now=1100)
+    assert third[0]['checked'] and third[0]['reason'].startswith("last checked 100s ago")
+
+    # Changing the fingerprint, here via the file's mtime, forces a re-check
+    monkeypatch.setattr(incremental_verify, "get_mtime", lambda path: 12345.0)
+    fourth = run_incremental(targets, state_path, max_age=60, now=1110)
+    assert fourth[0]['reason'] == "target changed"
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fleet_monitor import FleetMonitor
+import keepalive_probe
+from keepalive_probe import KeepaliveProbe, probe_all
+
+
+class SlowProbe:
+    def __init__(self, seconds, release=None):
+        self.target = {'db_type': "PostgreSQL"}
+        self.seconds = seconds
+        self.release = release
+
+    def probe(self):
+        if self.release is not None:
+            self.release.wait(self.seconds)
+        else:
+            time.sleep(self.seconds)
+        return {'success': True, 'message': "alive", 'rtt_ms': 1.0, 'reconnected': False, 'connect_ms': None}
+
+
+def sqlite_target(tmp_path):
+    path = tmp_path / "live.db"
+    sqlite3.connect(path).close()
+    return {'db_type': "SQLite", 'sqlite_file': str(path)}
+
+
+def test_probe_all_marks_probe_past_deadline_failed():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=4)
+    try:
+        started = time.monotonic()
+        results = probe_all([SlowProbe(0), SlowProbe(30, release), SlowProbe(0)], executor, deadline=0.3)
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+    assert elapsed < 5
+    assert [result['success'] for result in results] == [True, False, True]
+    assert "Timed out" in results[1]['message']
+
+
+def test_probe_reports_previous_probe_still_running(tmp_path):
+    probe = KeepaliveProbe(sqlite_target(tmp_path))
+    with probe.lock:
+        result = probe.probe()
+    assert not result['success']
+    assert "still running" in result['message']
+
+
+def test_sqlite_probe_reconnects_once(tmp_path):
+    probe = KeepaliveProbe(sqlite_target(tmp_path))
+    first = probe.probe()
+    second = probe.probe()
+    probe.close()
+
+    assert first['success'] and first['reconnected']
+    assert second['success'] and not second['reconnected']
+    assert probe.reconnects == 1
+
+
+def test_set_keepalive_switches_mode_and_closes_probes(tmp_path):
+    monitor = FleetMonitor([sqlite_target(tmp_path)], keepalive=True)
+    monitor.probe_once()
+    probes = monitor.keepalive_probes
+    assert probes[0].conn is not None
+
+    monitor.set_keepalive(False)
+    monitor.probe_once()
+    assert monitor.keepalive_probes is None
+    assert probes[0].conn is None
+
+    monitor.set_keepalive(True)
+    monitor.probe_once()
+    assert monitor.keepalive_probes is not None
+    monitor._close_probes()
+
+
+def test_keepalive_round_trip_is_kept_out_of_total_latency(tmp_path):
+    monitor = FleetMonitor([sqlite_target(tmp_path)])
+    monitor.probe_once()
+    monitor.set_keepalive(True)
+    monitor.probe_once()
+    monitor._close_probes()
+
+    columns = monitor.buffer.columns(ordered=True)
+    assert not np.isnan(columns['total_ms'][0]) and np.isnan(columns['query_ms'][0])
+    assert np.isnan(columns['total_ms'][1]) and not np.isnan(columns['query_ms'][1])
+    assert monitor.latency_stage() == 'query'
+    assert monitor.latency_percentiles(stage='query')['count'].tolist() == [1]
+    assert monitor.latency_buckets(60, stage='total')['median'].notna().all()
+
+
+def test_uri_targets_keep_their_ssl_settings(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(keepalive_probe.pymysql, "connect", lambda **kwargs: captured.setdefault('mysql', kwargs))
+    target = {
+        'db_type': "MySQL", 'uri': "mysql://u:p@db/app?ssl_ca=/ca.pem",
+        'ssl_options': {'use_ssl': True, 'client_cert': "/c.pem", 'client_key': "/c.key"},
+    }
+    keepalive_probe._connect_mysql(target, 5)
+    assert captured['mysql']['ssl'] == {'ca': "/ca.pem", 'cert': "/c.pem", 'key': "/c.key"}
+    assert captured['mysql']['read_timeout'] == 5
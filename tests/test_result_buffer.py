@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from result_buffer import BACKENDS, OUTCOMES, ResultBuffer, classify_outcome
+
+
+def test_append_accepts_numpy_integer_backend():
+    buffer = ResultBuffer(4)
+    buffer.append(0, np.uint8(1), 0)
+    buffer.append(0, "MySQL", 0)
+    assert list(buffer.columns()['backend']) == [1, 0]
+
+
+def test_wraparound_keeps_newest_results():
+    buffer = ResultBuffer(4)
+    for timestamp in range(6):
+        buffer.append(0, "MySQL", 0, {'total': timestamp}, timestamp=timestamp)
+
+    assert len(buffer) == 4
+    assert list(buffer.columns(ordered=True)['timestamp']) == [2, 3, 4, 5]
+    assert sorted(buffer.columns()['timestamp']) == [2, 3, 4, 5]
+
+
+def test_append_many_larger_than_capacity_keeps_newest():
+    buffer = ResultBuffer(3)
+    buffer.append_many(np.zeros(5), np.zeros(5), np.zeros(5), {'total': np.arange(5)}, np.arange(5))
+    assert list(buffer.columns(ordered=True)['total_ms']) == [2, 3, 4]
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(0)
+    buffer = ResultBuffer(500)
+    count = 800
+    backends = rng.integers(0, 3, count)
+    latencies = rng.random(count) * 100
+    buffer.append_many(np.zeros(count), backends, np.zeros(count), {'total': latencies}, np.arange(count))
+
+    result = buffer.percentiles("total", by='backend', q=(50, 95, 99))
+    columns = buffer.columns()
+    for code in range(3):
+        values = columns['total_ms'][columns['backend'] == code].astype(np.float64)
+        expected = np.percentile(values, [50, 95, 99])
+        row = result.loc[BACKENDS[code]]
+        assert row[['p50', 'p95', 'p99']].to_numpy() == pytest.approx(expected)
+        assert row['count'] == len(values)
+
+
+def test_percentiles_skip_unmeasured_stages_and_respect_since():
+    buffer = ResultBuffer(10)
+    buffer.append(0, "MySQL", 0, {'total': 10}, timestamp=1)
+    buffer.append(0, "MySQL", 0, {'total': 30}, timestamp=2)
+    buffer.append(0, "MySQL", 0, None, timestamp=3)
+
+    assert buffer.percentiles(q=(50,)).loc["MySQL", 'p50'] == 20
+    assert buffer.percentiles(q=(50,), since=2).loc["MySQL", 'count'] == 1
+
+
+def test_error_rates_by_backend_and_target():
+    buffer = ResultBuffer(10)
+    buffer.record("a", "MySQL", True, "ok")
+    buffer.record("a", "MySQL", False, "Connection refused")
+    buffer.record("b", "PostgreSQL", True, "ok")
+
+    by_backend = buffer.error_rates()
+    assert by_backend.loc["MySQL", 'error_rate'] == 0.5
+    assert by_backend.loc["PostgreSQL", 'error_rate'] == 0
+    assert list(buffer.error_rates(by='target').index) == ["a", "b"]
+
+
+def test_classify_outcome():
+    assert OUTCOMES[classify_outcome(True, "")] == "success"
+    assert OUTCOMES[classify_outcome(False, "Connection timed out")] == "timeout"
+    assert OUTCOMES[classify_outcome(False, "Access denied for user")] == "auth"
+    assert OUTCOMES[classify_outcome(False, "something odd")] == "error"
+
+
+def test_to_dataframe_shares_memory():
+    buffer = ResultBuffer(8)
+    buffer.append(0, "MySQL", 0, {'total': 1})
+    frame = buffer.to_dataframe()
+    assert np.shares_memory(frame['total_ms'].to_numpy(), buffer.latencies['total'])
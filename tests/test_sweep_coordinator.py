@@ -0,0 +1,104 @@
+import sqlite3
+
+from sweep_coordinator import (
+    DEADLINE_MESSAGE,
+    SweepCoordinator,
+    filter_results,
+    is_loopback,
+    run_sweep,
+    split_shards,
+)
+
+
+def test_split_shards_contiguous_and_balanced():
+    assert [list(shard) for shard in split_shards(7, 3)] == [[0, 1, 2], [3, 4], [5, 6]]
+    assert [list(shard) for shard in split_shards(2, 5)] == [[0], [1]]
+    assert [list(shard) for shard in split_shards(0, 3)] == [[]]
+
+
+def test_take_batch_drains_own_shard_then_steals_from_largest_tail():
+    coordinator = SweepCoordinator(range(10), shard_count=2, batch_size=2)
+    own = coordinator.claim_shard()
+    assert own == 0
+
+    batches = [coordinator.take_batch(own)[1] for _ in range(3)]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+    # Shard 0 is empty, so the worker steals from the back of shard 1
+    assert coordinator.take_batch(own)[1] == [8, 9]
+    assert list(coordinator.shards[1]) == [5, 6, 7]
+
+
+def test_extra_workers_only_steal():
+    coordinator = SweepCoordinator(range(4), shard_count=1, batch_size=10)
+    assert coordinator.claim_shard() == 0
+    assert coordinator.claim_shard() is None
+    # Steals at most half of the victim shard, rounded up
+    assert coordinator.take_batch(None)[1] == [2, 3]
+
+
+def test_released_lease_is_requeued_without_finished_targets():
+    coordinator = SweepCoordinator(range(4), shard_count=1, batch_size=4)
+    lease_id, batch = coordinator.take_batch(0)
+    assert batch == [0, 1, 2, 3]
+
+    coordinator.record_results([[1, True, "ok"]])
+    coordinator.release_lease(lease_id)
+    assert list(coordinator.shards[0]) == [0, 2, 3]
+
+
+def test_expired_lease_is_handed_out_again():
+    coordinator = SweepCoordinator(range(3), shard_count=1, batch_size=3, lease_seconds=10)
+    _, batch = coordinator.take_batch(0, now=0)
+    assert batch == [0, 1, 2]
+    assert coordinator.take_batch(0, now=5) == (None, [])
+    assert coordinator.take_batch(0, now=11)[1] == [0, 1, 2]
+
+
+def test_finish_fills_missing_results():
+    coordinator = SweepCoordinator(range(2), shard_count=1)
+    coordinator.record_results([[0, True, "ok"]])
+    assert not coordinator.is_finished()
+    coordinator.finish(DEADLINE_MESSAGE)
+    assert coordinator.is_finished()
+    assert coordinator.results == [(True, "ok"), (False, DEADLINE_MESSAGE)]
+
+
+def test_filter_results_only_accepts_current_batch():
+    results = [[1, True, "ok"], [-1, False, "x"], [99, True, "x"], [True, True, "x"], [2, "yes", "x"], "junk"]
+    assert filter_results(results, [1, 2]) == [[1, True, "ok"]]
+
+
+def test_check_token():
+    assert SweepCoordinator([]).check_token(None)
+    coordinator = SweepCoordinator([], token="secret")
+    assert coordinator.check_token("secret")
+    assert not coordinator.check_token("wrong")
+    assert not coordinator.check_token(None)
+
+
+def test_is_loopback():
+    assert is_loopback("127.0.0.1")
+    assert is_loopback("::1")
+    assert is_loopback("localhost")
+    assert not is_loopback("0.0.0.0")
+    assert not is_loopback("db-prober.internal")
+
+
+def test_run_sweep_over_sqlite_targets(tmp_path):
+    good = tmp_path / "good.db"
+    sqlite3.connect(good).close()
+    targets = []
+    for index in range(30):
+        if index % 3 == 0:
+            targets.append({'db_type': "SQLite", 'sqlite_file': str(good)})
+        else:
+            targets.append({'db_type': "SQLite", 'sqlite_file': str(tmp_path / f"missing{index}.db")})
+
+    results = run_sweep(targets, workers=2, batch_size=4, deadline=120)
+
+    assert len(results) == len(targets)
+    for index, (success, message) in enumerate(results):
+        assert success == (index % 3 == 0)
+        if not success:
+            assert f"missing{index}.db" in message